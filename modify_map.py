@@ -4,47 +4,44 @@ Modify m1.map to create an open arena courtyard
 Removes ceiling brushes from the central area while keeping Quake aesthetic
 """
 
-import re
-
 
 def parse_face(line):
-    """Parse a brush face line"""
+    """Parse a brush face line into (p1, p2, p3, tex_id, params)"""
     # Format: ( x y z ) ( x y z ) ( x y z ) tex_id offset_x offset_y rot scale_x scale_y
-    match = re.match(
-        r"\s*\(\s*([^)]+)\)\s*\(\s*([^)]+)\)\s*\(\s*([^)]+)\)\s*(.+)", line
-    )
-    if not match:
+    tokens = line.split()
+    if (
+        len(tokens) < 15
+        or tokens[0] != "("
+        or tokens[4] != ")"
+        or tokens[5] != "("
+        or tokens[9] != ")"
+        or tokens[10] != "("
+        or tokens[14] != ")"
+    ):
         return None
 
-    p1 = [float(x) for x in match.group(1).split()]
-    p2 = [float(x) for x in match.group(2).split()]
-    p3 = [float(x) for x in match.group(3).split()]
-    rest = match.group(4).strip().split()
+    p1 = (float(tokens[1]), float(tokens[2]), float(tokens[3]))
+    p2 = (float(tokens[6]), float(tokens[7]), float(tokens[8]))
+    p3 = (float(tokens[11]), float(tokens[12]), float(tokens[13]))
+    tex_id = int(tokens[15]) if len(tokens) > 15 else 0
 
-    return {
-        "p1": p1,
-        "p2": p2,
-        "p3": p3,
-        "tex_id": int(rest[0]) if rest else 0,
-        "params": rest[1:] if len(rest) > 1 else [],
-    }
+    return (p1, p2, p3, tex_id, tokens[16:])
 
 
 def get_brush_bounds(faces):
     """Calculate brush bounds from faces"""
     all_points = []
     for face in faces:
-        all_points.extend([face["p1"], face["p2"], face["p3"]])
+        all_points.extend(face[:3])
 
     if not all_points:
         return None
 
-    min_x = min(p[0] for p in all_points)
-    max_x = max(p[0] for p in all_points)
-    min_y = min(p[1] for p in all_points)
-    max_y = max(p[1] for p in all_points)
-    min_z = min(p[2] for p in all_points)
-    max_z = max(p[2] for p in all_points)
+    # Transpose once into per-axis tuples, then min/max each axis in C
+    xs, ys, zs = zip(*all_points)
+    min_x, max_x = min(xs), max(xs)
+    min_y, max_y = min(ys), max(ys)
+    min_z, max_z = min(zs), max(zs)
 
     return {
         "min": (min_x, min_y, min_z),
@@ -58,78 +55,72 @@ def is_ceiling_brush(bounds):
     if not bounds:
         return False
 
-    center = bounds["center"]
     min_z = bounds["min"][2]
     max_z = bounds["max"][2]
 
-    # Courtyard area roughly: x: 700-1500, y: -300-800
-    in_courtyard = 700 <= center[0] <= 1500 and -300 <= center[1] <= 800
-
+    # Height tests first: most brushes are low or thick and bail out here
     # Ceiling is high up (z > 600)
-    is_high = min_z > 600
+    if min_z <= 600:
+        return False
 
     # Brush is relatively thin (ceiling slabs less than 128 units thick)
-    thickness = max_z - min_z
-    is_thin = thickness < 128
+    if max_z - min_z >= 128:
+        return False
 
-    return in_courtyard and is_high and is_thin
+    # Courtyard area roughly: x: 700-1500, y: -300-800
+    center = bounds["center"]
+    return 700 <= center[0] <= 1500 and -300 <= center[1] <= 800
 
 
 def modify_map(input_file, output_file):
-    """Modify the map to create open arena"""
-
-    with open(input_file, "r") as f:
-        content = f.read()
+    """Modify the map to create open arena
 
-    lines = content.split("\n")
-    output_lines = []
+    Streams input to output line by line, so the two must be different files.
+    """
 
     in_brush = False
     current_brush_lines = []
     removed_count = 0
     kept_count = 0
 
-    for line in lines:
-        stripped = line.strip()
-
-        # Start of brush
-        if stripped == "{":
-            in_brush = True
-            current_brush_lines = [line]
-            continue
-
-        # End of brush
-        if stripped == "}" and in_brush:
-            current_brush_lines.append(line)
-            in_brush = False
-
-            # Parse brush faces
-            faces = []
-            for brush_line in current_brush_lines[1:-1]:  # Skip { and }
-                face = parse_face(brush_line)
-                if face:
-                    faces.append(face)
-
-            # Check if this is a ceiling to remove
-            bounds = get_brush_bounds(faces)
-            if bounds and is_ceiling_brush(bounds):
-                removed_count += 1
-                continue  # Skip this brush (remove ceiling)
+    with open(input_file, "r") as src, open(output_file, "w") as out:
+        for line in src:
+            stripped = line.strip()
+
+            # Start of brush
+            if stripped == "{":
+                in_brush = True
+                current_brush_lines = [line]
+                continue
+
+            # End of brush
+            if stripped == "}" and in_brush:
+                current_brush_lines.append(line)
+                in_brush = False
+
+                # Parse brush faces
+                faces = []
+                for brush_line in current_brush_lines[1:-1]:  # Skip { and }
+                    face = parse_face(brush_line)
+                    if face:
+                        faces.append(face)
+
+                # Check if this is a ceiling to remove
+                bounds = get_brush_bounds(faces)
+                if bounds and is_ceiling_brush(bounds):
+                    removed_count += 1
+                    continue  # Skip this brush (remove ceiling)
+                else:
+                    kept_count += 1
+                    out.write("".join(current_brush_lines))
+
+                continue
+
+            # Inside brush
+            if in_brush:
+                current_brush_lines.append(line)
             else:
-                kept_count += 1
-                output_lines.extend(current_brush_lines)
-
-            continue
-
-        # Inside brush
-        if in_brush:
-            current_brush_lines.append(line)
-        else:
-            output_lines.append(line)
-
-    # Write output
-    with open(output_file, "w") as f:
-        f.write("\n".join(output_lines))
+                out.write(line)
 
     print(f"Modified map written to: {output_file}")
     print(f"Removed {removed_count} ceiling brushes")
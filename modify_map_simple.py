@@ -8,13 +8,16 @@ Simple modification to m1.map:
 
 import re
 
+# Whole trigger_levelchange entity, compiled once and matched against bytes
+TRIGGER_LEVELCHANGE_RE = re.compile(rb'\{\s*"classname"\s*"trigger_levelchange"[^}]*\}')
+
 def modify_map():
-    with open('assets/maps/m1.map', 'r') as f:
+    with open('assets/maps/m1.map', 'rb') as f:
         content = f.read()
     
     # Count brushes in worldspawn
     # Find the worldspawn section and count braces
-    lines = content.split('\n')
+    lines = content.split(b'\n')
     
     # Find the end of the worldspawn entity
     worldspawn_start = 0
@@ -23,16 +26,16 @@ def modify_map():
     in_worldspawn = False
     
     for i, line in enumerate(lines):
-        if 'classname' in line and 'worldspawn' in line:
+        if b'classname' in line and b'worldspawn' in line:
             in_worldspawn = True
             worldspawn_start = i
             brace_count = 1  # Account for the opening brace before worldspawn
             continue
         
         if in_worldspawn:
-            if '{' in line:
+            if b'{' in line:
                 brace_count += 1
-            if '}' in line:
+            if b'}' in line:
                 brace_count -= 1
                 if brace_count == 0:
                     worldspawn_end = i
@@ -43,14 +46,12 @@ def modify_map():
     
     # Instead of removing brushes, let's just modify the entity section
     # Remove trigger_levelchange
-    content = re.sub(
-        r'\{\s*"classname"\s*"trigger_levelchange"[^}]*\}',
-        '',
-        content
-    )
+    # Plain substring check first so maps without one skip the regex scan
+    if b'"trigger_levelchange"' in content:
+        content = TRIGGER_LEVELCHANGE_RE.sub(b'', content)
     
     # Add some extra pickups at strategic locations
-    extra_entities = '''
+    extra_entities = b'''
 
 {
     "classname" "pickup_health"
@@ -74,9 +75,9 @@ def modify_map():
 '''
     
     # Insert extra entities before the last entity
-    content = content.rstrip() + extra_entities + '\n'
+    content = content.rstrip() + extra_entities + b'\n'
     
-    with open('assets/maps/m1.map', 'w') as f:
+    with open('assets/maps/m1.map', 'wb') as f:
         f.write(content)
     
     print("Map modified successfully!")
@@ -0,0 +1,29 @@
+"""
+Homogeneous collection encoding (JSONH style)
+Lists of same-shaped records are sent as one key header plus a flat value
+list: [key_count, key1, ..., keyN, row1_value1, ..., row1_valueN, row2_value1, ...]
+"""
+from typing import Any, Dict, Iterable, List, Sequence
+
+
+def hc_encode(rows: Iterable[Sequence[Any]], keys: Sequence[str]) -> List[Any]:
+    """Pack rows (values given in key order) into a flat list"""
+    packed: List[Any] = [len(keys), *keys]
+    for row in rows:
+        packed.extend(row)
+    return packed
+
+
+def hc_encode_dicts(records: Iterable[Dict[str, Any]], keys: Sequence[str]) -> List[Any]:
+    """Pack dicts into a flat list, taking the values of keys in order"""
+    return hc_encode(([record[key] for key in keys] for record in records), keys)
+
+
+def hc_decode(packed: Sequence[Any]) -> List[Dict[str, Any]]:
+    """Unpack a flat list produced by hc_encode back into dicts"""
+    if not packed:
+        return []
+    count = packed[0]
+    keys = packed[1:count + 1]
+    values = packed[count + 1:]
+    return [dict(zip(keys, values[i:i + count])) for i in range(0, len(values), count)]
@@ -3,8 +3,12 @@ Quake .map format parser
 Ported from TrenchBroom's MapReader.cpp
 Recursive descent parser supporting standard Quake map format
 """
-from typing import Optional, Tuple, List
-from .map_types import Vec3, Face, Brush, Entity, MapFile
+import re
+import sys
+from array import array
+from operator import itemgetter
+from typing import Optional, Tuple, List, Union
+from .map_types import Face, Brush, Entity, MapFile
 
 
 class ParseError(Exception):
@@ -15,129 +19,149 @@ class ParseError(Exception):
         self.column = column
 
 
+# One token per match: quoted string, structural character or bare word.
+# Comments match the first (ungrouped) alternative and come back empty.
+_TOKEN_RE = re.compile(rb'//[^\n\r]*|("[^"]*"?|[{}()]|[^\s{}()"]+)')
+
+_DELIMITERS = (b'{', b'}', b'(', b')')
+
+# Standard face layout: ( x y z ) ( x y z ) ( x y z ) texture u v rot su sv
+_FACE_TOKENS = 21
+_face_delimiters = itemgetter(0, 4, 5, 9, 10, 14)
+_FACE_DELIMITERS = (b'(', b')', b'(', b')', b'(', b')')
+_face_coords = itemgetter(1, 2, 3, 6, 7, 8, 11, 12, 13)
+_face_params = itemgetter(16, 17, 18, 19, 20)
+
+
 class MapParser:
-    """Recursive descent parser for Quake .map format"""
+    """Recursive descent parser for Quake .map format
+    
+    The whole buffer is split into tokens up front in a single regex pass;
+    the parser then walks the token list with an integer cursor. Line and
+    column are only worked out when an error is raised.
+    """
     
-    def __init__(self, source: str):
+    def __init__(self, source: Union[str, bytes]):
+        if isinstance(source, str):
+            source = source.encode('utf-8')
         self.source = source
+        self.tokens: List[bytes] = list(filter(None, _TOKEN_RE.findall(source)))
         self.pos = 0
-        self.line = 1
-        self.column = 1
-        self.length = len(source)
+        self.length = len(self.tokens)
     
     def parse(self) -> MapFile:
         """Parse entire map file and return MapFile"""
         mapfile = MapFile()
         
-        self._skip_whitespace_and_comments()
-        
         while self.pos < self.length:
-            self._skip_whitespace_and_comments()
-            
-            if self.pos >= self.length:
-                break
-            
-            if self._peek() == '{':
-                entity = self._parse_entity()
-                mapfile.add_entity(entity)
-            else:
-                raise ParseError(
-                    f"Expected '{{' to start entity, got '{self._peek()}'",
-                    self.line, self.column
+            if self._peek() != b'{':
+                raise self._error(
+                    f"Expected '{{' to start entity, got '{self._peek_text()}'"
                 )
-            
-            self._skip_whitespace_and_comments()
+            entity = self._parse_entity()
+            mapfile.add_entity(entity)
         
         return mapfile
     
     def _parse_entity(self) -> Entity:
         """Parse entity: { properties brushes }"""
-        self._expect('{')
-        self._skip_whitespace_and_comments()
+        self._expect(b'{')
         
         entity = Entity()
         
         # Parse properties first
-        while self.pos < self.length and self._peek() == '"':
+        while self._peek().startswith(b'"'):
             key, value = self._parse_property()
             entity.set_property(key, value)
-            self._skip_whitespace_and_comments()
         
         # Then parse brushes
-        while self.pos < self.length and self._peek() == '{':
-            brush = self._parse_brush()
-            entity.brushes.append(brush)
-            self._skip_whitespace_and_comments()
+        tokens = self.tokens
+        length = self.length
+        brushes = entity.brushes
+        while self.pos < length and tokens[self.pos] == b'{':
+            brushes.append(self._parse_brush())
         
-        self._expect('}')
+        self._expect(b'}')
         
         return entity
     
     def _parse_property(self) -> Tuple[str, str]:
         """Parse property: key value pair in quotes"""
-        key = self._parse_quoted_string()
-        self._skip_whitespace_and_comments()
+        key = sys.intern(self._parse_quoted_string())
         value = self._parse_quoted_string()
         return (key, value)
     
     def _parse_brush(self) -> Brush:
         """Parse brush: { faces }"""
-        self._expect('{')
-        self._skip_whitespace_and_comments()
+        self._expect(b'{')
         
         brush = Brush()
         
+        # Hot loop: bind lookups to locals instead of going through _peek()
+        tokens = self.tokens
+        length = self.length
+        faces = brush.faces
+        parse_face = self._parse_face
+        
         # Parse faces until we hit closing brace
-        while self.pos < self.length and self._peek() == '(':
-            face = self._parse_face()
-            brush.faces.append(face)
-            self._skip_whitespace_and_comments()
+        while self.pos < length and tokens[self.pos] == b'(':
+            faces.append(parse_face())
         
-        self._expect('}')
+        self._expect(b'}')
         
         return brush
     
     def _parse_face(self) -> Face:
         """Parse face: ( p1 ) ( p2 ) ( p3 ) texture u v rot su sv"""
+        # Nearly every face has the standard 21-token layout; take it in one
+        # slice and fall back to the token-by-token path for anything else
+        start = self.pos
+        t = self.tokens[start:start + _FACE_TOKENS]
+        if len(t) == _FACE_TOKENS and _face_delimiters(t) == _FACE_DELIMITERS:
+            texture = t[15]
+            if texture not in _DELIMITERS and not texture.startswith(b'"'):
+                try:
+                    coords = array('d', map(float, _face_coords(t)))
+                    offset_u, offset_v, rotation, scale_u, scale_v = map(float, _face_params(t))
+                except ValueError:
+                    pass
+                else:
+                    self.pos = start + _FACE_TOKENS
+                    return Face(
+                        coords=coords,
+                        texture=texture.decode('utf-8'),
+                        offset_u=offset_u,
+                        offset_v=offset_v,
+                        rotation=rotation,
+                        scale_u=scale_u,
+                        scale_v=scale_v
+                    )
+        
+        return self._parse_face_generic()
+    
+    def _parse_face_generic(self) -> Face:
+        """Parse a face token by token, reporting exactly where it breaks"""
         # Parse three points
         point1 = self._parse_point()
-        self._skip_whitespace()
-        
         point2 = self._parse_point()
-        self._skip_whitespace()
-        
         point3 = self._parse_point()
-        self._skip_whitespace()
         
         # Parse texture name
         texture = self._parse_token()
-        self._skip_whitespace()
         
-        # Parse texture parameters
-        try:
-            offset_u = float(self._parse_token())
-            self._skip_whitespace()
-            
-            offset_v = float(self._parse_token())
-            self._skip_whitespace()
-            
-            rotation = float(self._parse_token())
-            self._skip_whitespace()
-            
-            scale_u = float(self._parse_token())
-            self._skip_whitespace()
-            
-            scale_v = float(self._parse_token())
-        except ValueError as e:
-            raise ParseError(
-                f"Invalid numeric value in face: {e}",
-                self.line, self.column
-            )
+        # Parse texture parameters, converting all five in one batch
+        start = self.pos
+        params = self.tokens[start:start + 5]
+        if len(params) < 5:
+            self.pos = self.length
+            raise self._error("Unexpected end of file")
+        offset_u, offset_v, rotation, scale_u, scale_v = self._parse_floats(
+            params, start, "Invalid numeric value in face"
+        )
+        self.pos = start + 5
         
         return Face(
-            point1=point1,
-            point2=point2,
-            point3=point3,
+            coords=point1 + point2 + point3,
             texture=texture,
             offset_u=offset_u,
             offset_v=offset_v,
@@ -146,135 +170,122 @@ class MapParser:
             scale_v=scale_v
         )
     
-    def _parse_point(self) -> Vec3:
+    def _parse_point(self) -> Tuple[float, float, float]:
         """Parse point: ( x y z )"""
-        self._expect('(')
-        self._skip_whitespace()
+        # Take the five tokens as one slice and convert the three in between
+        start = self.pos
+        t = self.tokens[start:start + 5]
+        if len(t) == 5 and t[0] == b'(' and t[4] == b')':
+            x, y, z = self._parse_floats(t[1:4], start + 1, "Invalid coordinate in point")
+            self.pos = start + 5
+            return (x, y, z)
         
-        try:
-            x = float(self._parse_token())
-            self._skip_whitespace()
-            
-            y = float(self._parse_token())
-            self._skip_whitespace()
-            
-            z = float(self._parse_token())
-        except ValueError as e:
-            raise ParseError(
-                f"Invalid coordinate in point: {e}",
-                self.line, self.column
-            )
+        # Malformed point: walk it token by token to report where it breaks
+        self._expect(b'(')
         
-        self._skip_whitespace()
-        self._expect(')')
+        start = self.pos
+        coords = [self._next(), self._next(), self._next()]
+        x, y, z = self._parse_floats(coords, start, "Invalid coordinate in point")
+        
+        self._expect(b')')
         
-        return Vec3(x, y, z)
+        return (x, y, z)
+    
+    def _parse_floats(self, tokens: List[bytes], start: int, message: str) -> List[float]:
+        """Convert consecutive tokens (from index start) to floats
+        
+        On failure the ParseError names the offending token as text and
+        points at it, rather than echoing float()'s bytes repr.
+        """
+        values = []
+        for i, token in enumerate(tokens):
+            try:
+                values.append(float(token))
+            except ValueError:
+                text = token.decode('utf-8', 'replace')
+                raise self._error(
+                    f"{message}: could not convert string to float: {text!r}", start + i
+                )
+        return values
     
     def _parse_quoted_string(self) -> str:
         """Parse a quoted string: \"content\""""
-        self._expect('"')
-        
-        start = self.pos
-        while self.pos < self.length and self._peek() != '"':
-            self._advance()
-        
-        content = self.source[start:self.pos]
-        self._expect('"')
-        
-        return content
+        token = self._peek()
+        if len(token) < 2 or not token.startswith(b'"') or not token.endswith(b'"'):
+            raise self._error(f"Expected quoted string, got '{self._peek_text()}'")
+        self.pos += 1
+        return token[1:-1].decode('utf-8')
     
     def _parse_token(self) -> str:
-        """Parse a non-whitespace token"""
-        self._skip_whitespace()
-        
-        start = self.pos
+        """Parse a non-structural token"""
+        token = self._peek()
         
         # Handle quoted strings as tokens
-        if self._peek() == '"':
+        if token.startswith(b'"'):
             return self._parse_quoted_string()
         
-        # Read until whitespace or special characters
-        while self.pos < self.length:
-            c = self._peek()
-            if c.isspace() or c in '{}()':
-                break
-            self._advance()
+        if not token or token in _DELIMITERS:
+            raise self._error(f"Expected token, got '{self._peek_text()}'")
         
-        if start == self.pos:
-            raise ParseError(
-                f"Expected token, got '{self._peek()}'",
-                self.line, self.column
-            )
-        
-        return self.source[start:self.pos]
-    
-    def _skip_whitespace(self) -> None:
-        """Skip whitespace but not newlines"""
-        while self.pos < self.length and self._peek() in ' \t\r':
-            self._advance()
-    
-    def _skip_whitespace_and_comments(self) -> None:
-        """Skip whitespace and // style comments"""
-        while self.pos < self.length:
-            c = self._peek()
-            
-            # Single-line comments
-            if c == '/' and self.pos + 1 < self.length and self.source[self.pos + 1] == '/':
-                self._advance()  # skip first /
-                self._advance()  # skip second /
-                # Skip until newline
-                while self.pos < self.length and self._peek() not in '\n\r':
-                    self._advance()
-            
-            # Whitespace
-            elif c.isspace():
-                self._advance()
-            
-            # Not whitespace or comment, done
-            else:
-                break
+        self.pos += 1
+        return token.decode('utf-8')
     
-    def _peek(self) -> str:
-        """Peek at current character"""
+    def _peek(self) -> bytes:
+        """Peek at current token, empty at end of input"""
         if self.pos < self.length:
-            return self.source[self.pos]
-        return '\0'
+            return self.tokens[self.pos]
+        return b''
     
-    def _advance(self) -> str:
-        """Advance to next character, updating line/column"""
+    def _peek_text(self) -> str:
+        """Current token as text, for error messages"""
+        return self._peek().decode('utf-8', 'replace') or 'EOF'
+    
+    def _next(self) -> bytes:
+        """Consume and return the current token"""
         if self.pos >= self.length:
-            return '\0'
-        
-        c = self.source[self.pos]
+            raise self._error("Unexpected end of file")
+        token = self.tokens[self.pos]
         self.pos += 1
-        
-        if c == '\n':
-            self.line += 1
-            self.column = 1
-        else:
-            self.column += 1
-        
-        return c
+        return token
     
-    def _expect(self, expected: str) -> None:
-        """Expect a specific character"""
-        actual = self._peek()
-        if actual != expected:
-            raise ParseError(
-                f"Expected '{expected}', got '{actual}'",
-                self.line, self.column
+    def _expect(self, expected: bytes) -> None:
+        """Expect a specific structural token"""
+        if self._peek() != expected:
+            raise self._error(
+                f"Expected '{expected.decode()}', got '{self._peek_text()}'"
             )
-        self._advance()
+        self.pos += 1
+    
+    def _error(self, message: str, index: Optional[int] = None) -> ParseError:
+        """Build a ParseError for the token at index (default: current)"""
+        offset = self._token_offset(self.pos if index is None else index)
+        line = self.source.count(b'\n', 0, offset) + 1
+        column = offset - self.source.rfind(b'\n', 0, offset)
+        return ParseError(message, line, column)
+    
+    def _token_offset(self, index: int) -> int:
+        """Byte offset of a token, found by re-scanning (error path only)"""
+        for match in _TOKEN_RE.finditer(self.source):
+            if match.group(1) is None:
+                continue
+            if index == 0:
+                return match.start()
+            index -= 1
+        return len(self.source)
 
 
-def parse_map(source: str) -> MapFile:
-    """Parse map from string source"""
+def parse_map(source: Union[str, bytes]) -> MapFile:
+    """Parse map from string or bytes source"""
     parser = MapParser(source)
     return parser.parse()
 
 
 def parse_map_file(filepath: str) -> MapFile:
-    """Parse map from file"""
-    with open(filepath, 'r') as f:
-        source = f.read()
-    return parse_map(source)
+    """Parse map from file
+
+    Read as bytes, not memory-mapped: the tokenizer copies every token out
+    anyway, and a mapping would SIGBUS the process if an editor truncated
+    the file mid-parse.
+    """
+    with open(filepath, 'rb') as f:
+        return parse_map(f.read())
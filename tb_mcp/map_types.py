@@ -2,12 +2,14 @@
 TrenchBroom-based map data structures
 Ported from TrenchBroom's C++ model classes
 """
+from array import array
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Tuple
+from typing import Iterable, List, Dict, Optional, Tuple
 import math
+import sys
 
 
-@dataclass
+@dataclass(slots=True)
 class Vec3:
     """3D vector with math operations - uses Z-up coordinate system"""
     x: float = 0.0
@@ -71,12 +73,28 @@ class Vec3:
         return f"Vec3({self.x}, {self.y}, {self.z})"
 
 
-@dataclass
+def _union_bounds(boxes: Iterable[Tuple[Vec3, Vec3]]) -> Tuple[Vec3, Vec3]:
+    """Combine (min, max) boxes in a single pass"""
+    min_x = min_y = min_z = math.inf
+    max_x = max_y = max_z = -math.inf
+    for bmin, bmax in boxes:
+        if bmin.x < min_x: min_x = bmin.x
+        if bmin.y < min_y: min_y = bmin.y
+        if bmin.z < min_z: min_z = bmin.z
+        if bmax.x > max_x: max_x = bmax.x
+        if bmax.y > max_y: max_y = bmax.y
+        if bmax.z > max_z: max_z = bmax.z
+    return (Vec3(min_x, min_y, min_z), Vec3(max_x, max_y, max_z))
+
+
+@dataclass(slots=True, init=False)
 class Face:
-    """Brush face with three points defining a plane"""
-    point1: Vec3 = field(default_factory=Vec3)
-    point2: Vec3 = field(default_factory=Vec3)
-    point3: Vec3 = field(default_factory=Vec3)
+    """Brush face with three points defining a plane
+    
+    The three points are packed into one flat array of nine doubles
+    (x1 y1 z1 x2 y2 z2 x3 y3 z3); point1..point3 build Vec3s on demand.
+    """
+    coords: array
     texture: str = ""
     offset_u: float = 0.0
     offset_v: float = 0.0
@@ -84,65 +102,137 @@ class Face:
     scale_u: float = 1.0
     scale_v: float = 1.0
     
+    def __init__(self, point1: Optional[Vec3] = None, point2: Optional[Vec3] = None,
+                 point3: Optional[Vec3] = None, texture: str = "",
+                 offset_u: float = 0.0, offset_v: float = 0.0, rotation: float = 0.0,
+                 scale_u: float = 1.0, scale_v: float = 1.0,
+                 coords: Optional[Iterable[float]] = None):
+        if coords is not None:
+            self.coords = array('d', coords)
+        else:
+            self.coords = array('d', (0.0,) * 9)
+            if point1 is not None:
+                self.point1 = point1
+            if point2 is not None:
+                self.point2 = point2
+            if point3 is not None:
+                self.point3 = point3
+        self.texture = texture
+        self.offset_u = offset_u
+        self.offset_v = offset_v
+        self.rotation = rotation
+        self.scale_u = scale_u
+        self.scale_v = scale_v
+    
+    @property
+    def point1(self) -> Vec3:
+        c = self.coords
+        return Vec3(c[0], c[1], c[2])
+    
+    @point1.setter
+    def point1(self, value: Vec3) -> None:
+        self.coords[0:3] = array('d', (value.x, value.y, value.z))
+    
+    @property
+    def point2(self) -> Vec3:
+        c = self.coords
+        return Vec3(c[3], c[4], c[5])
+    
+    @point2.setter
+    def point2(self, value: Vec3) -> None:
+        self.coords[3:6] = array('d', (value.x, value.y, value.z))
+    
+    @property
+    def point3(self) -> Vec3:
+        c = self.coords
+        return Vec3(c[6], c[7], c[8])
+    
+    @point3.setter
+    def point3(self, value: Vec3) -> None:
+        self.coords[6:9] = array('d', (value.x, value.y, value.z))
+    
     def normal(self) -> Vec3:
         """Calculate face normal from three points"""
-        v1 = self.point2 - self.point1
-        v2 = self.point3 - self.point1
+        p1 = self.point1
+        v1 = self.point2 - p1
+        v2 = self.point3 - p1
         return v1.cross(v2).normalized()
     
     def center(self) -> Vec3:
         """Calculate center point of the face triangle"""
-        return (self.point1 + self.point2 + self.point3) / 3.0
+        c = self.coords
+        return Vec3(
+            (c[0] + c[3] + c[6]) / 3.0,
+            (c[1] + c[4] + c[7]) / 3.0,
+            (c[2] + c[5] + c[8]) / 3.0
+        )
     
     def move(self, offset: Vec3) -> None:
         """Move face by offset"""
-        self.point1 = self.point1 + offset
-        self.point2 = self.point2 + offset
-        self.point3 = self.point3 + offset
+        c = self.coords
+        for i in (0, 3, 6):
+            c[i] += offset.x
+            c[i + 1] += offset.y
+            c[i + 2] += offset.z
     
     def copy(self) -> 'Face':
         """Create a copy of this face"""
-        return Face(
-            point1=Vec3(self.point1.x, self.point1.y, self.point1.z),
-            point2=Vec3(self.point2.x, self.point2.y, self.point2.z),
-            point3=Vec3(self.point3.x, self.point3.y, self.point3.z),
-            texture=self.texture,
-            offset_u=self.offset_u,
-            offset_v=self.offset_v,
-            rotation=self.rotation,
-            scale_u=self.scale_u,
-            scale_v=self.scale_v
-        )
+        # Skip __init__: the points are a single array slice (one memcpy)
+        face = Face.__new__(Face)
+        face.coords = self.coords[:]
+        face.texture = self.texture
+        face.offset_u = self.offset_u
+        face.offset_v = self.offset_v
+        face.rotation = self.rotation
+        face.scale_u = self.scale_u
+        face.scale_v = self.scale_v
+        return face
     
     def __repr__(self) -> str:
         return f"Face({self.point1}, {self.point2}, {self.point3}, texture='{self.texture}')"
 
 
-@dataclass
+@dataclass(slots=True)
 class Brush:
     """Brush composed of multiple faces defining a convex volume"""
     faces: List[Face] = field(default_factory=list)
+    _bounds: Optional[Tuple[Vec3, Vec3]] = field(default=None, init=False, repr=False, compare=False)
     
     def bounds(self) -> Tuple[Vec3, Vec3]:
-        """Calculate axis-aligned bounding box (min, max)"""
+        """Calculate axis-aligned bounding box (min, max)
+        
+        The result is cached and kept in sync by move(); call
+        invalidate_bounds() after editing faces directly.
+        """
+        if self._bounds is None:
+            self._bounds = self._compute_bounds()
+        return self._bounds
+    
+    def invalidate_bounds(self) -> None:
+        """Drop cached bounds so the next bounds() call recomputes them"""
+        self._bounds = None
+    
+    def _compute_bounds(self) -> Tuple[Vec3, Vec3]:
         if not self.faces:
             return (Vec3(), Vec3())
         
-        all_points = []
+        # Single pass tracking six scalars
+        min_x = min_y = min_z = math.inf
+        max_x = max_y = max_z = -math.inf
         for face in self.faces:
-            all_points.extend([face.point1, face.point2, face.point3])
+            c = face.coords
+            for i in (0, 3, 6):
+                x = c[i]
+                y = c[i + 1]
+                z = c[i + 2]
+                if x < min_x: min_x = x
+                if x > max_x: max_x = x
+                if y < min_y: min_y = y
+                if y > max_y: max_y = y
+                if z < min_z: min_z = z
+                if z > max_z: max_z = z
         
-        min_vec = Vec3(
-            min(p.x for p in all_points),
-            min(p.y for p in all_points),
-            min(p.z for p in all_points)
-        )
-        max_vec = Vec3(
-            max(p.x for p in all_points),
-            max(p.y for p in all_points),
-            max(p.z for p in all_points)
-        )
-        return (min_vec, max_vec)
+        return (Vec3(min_x, min_y, min_z), Vec3(max_x, max_y, max_z))
     
     def center(self) -> Vec3:
         """Calculate center of brush bounds"""
@@ -153,10 +243,19 @@ class Brush:
         """Move brush by offset"""
         for face in self.faces:
             face.move(offset)
+        
+        # Translating a box is exact, no need to rescan the faces
+        if self._bounds is not None:
+            min_b, max_b = self._bounds
+            self._bounds = (min_b + offset, max_b + offset)
     
     def copy(self) -> 'Brush':
         """Create a copy of this brush"""
-        return Brush(faces=[face.copy() for face in self.faces])
+        brush = Brush(faces=[face.copy() for face in self.faces])
+        if self._bounds is not None:
+            min_b, max_b = self._bounds
+            brush._bounds = (Vec3(min_b.x, min_b.y, min_b.z), Vec3(max_b.x, max_b.y, max_b.z))
+        return brush
     
     def face_count(self) -> int:
         return len(self.faces)
@@ -165,7 +264,7 @@ class Brush:
         return f"Brush({len(self.faces)} faces)"
 
 
-@dataclass
+@dataclass(slots=True)
 class Entity:
     """Map entity with properties and optional brushes"""
     classname: str = ""
@@ -218,6 +317,9 @@ class Entity:
     
     def set_property(self, key: str, value: str) -> None:
         """Set property value"""
+        # Keys come from a small fixed vocabulary; interning shares one
+        # string object per key across every entity
+        key = sys.intern(key)
         self.properties[key] = value
         if key == 'classname':
             self.classname = value
@@ -230,24 +332,7 @@ class Entity:
         if not self.brushes:
             return None
         
-        all_mins = []
-        all_maxs = []
-        for brush in self.brushes:
-            bmin, bmax = brush.bounds()
-            all_mins.append(bmin)
-            all_maxs.append(bmax)
-        
-        min_vec = Vec3(
-            min(p.x for p in all_mins),
-            min(p.y for p in all_mins),
-            min(p.z for p in all_mins)
-        )
-        max_vec = Vec3(
-            max(p.x for p in all_maxs),
-            max(p.y for p in all_maxs),
-            max(p.z for p in all_maxs)
-        )
-        return (min_vec, max_vec)
+        return _union_bounds(brush.bounds() for brush in self.brushes)
     
     def copy(self) -> 'Entity':
         """Create a copy of this entity"""
@@ -261,7 +346,7 @@ class Entity:
         return f"Entity({self.classname}, {len(self.brushes)} brushes, props={list(self.properties.keys())})"
 
 
-@dataclass
+@dataclass(slots=True)
 class MapFile:
     """Complete Quake map file containing all entities"""
     entities: List[Entity] = field(default_factory=list)
@@ -323,26 +408,11 @@ class MapFile:
         if not self.entities:
             return None
         
-        all_bounds = []
-        for entity in self.entities:
-            eb = entity.bounds()
-            if eb:
-                all_bounds.append(eb)
-        
+        all_bounds = [eb for eb in (entity.bounds() for entity in self.entities) if eb]
         if not all_bounds:
             return None
         
-        min_vec = Vec3(
-            min(b[0].x for b in all_bounds),
-            min(b[0].y for b in all_bounds),
-            min(b[0].z for b in all_bounds)
-        )
-        max_vec = Vec3(
-            max(b[1].x for b in all_bounds),
-            max(b[1].y for b in all_bounds),
-            max(b[1].z for b in all_bounds)
-        )
-        return (min_vec, max_vec)
+        return _union_bounds(all_bounds)
     
     def copy(self) -> 'MapFile':
         """Create a copy of this map"""
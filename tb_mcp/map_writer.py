@@ -2,11 +2,14 @@
 Quake .map format writer
 Writes MapFile back to standard Quake .map format
 """
+import math
+from functools import lru_cache
+from typing import List
 from .map_types import MapFile, Entity, Brush, Face, Vec3
 
 
-def format_float(value: float) -> str:
-    """Format float with reasonable precision"""
+@lru_cache(maxsize=1 << 16)
+def _format_nonzero_float(value: float) -> str:
     # Remove trailing zeros and decimal point if not needed
     result = f"{value:.6f}"
     if '.' in result:
@@ -14,17 +17,26 @@ def format_float(value: float) -> str:
     return result
 
 
+def format_float(value: float) -> str:
+    """Format float with reasonable precision
+    
+    Results are memoised since maps repeat the same coordinates heavily.
+    Zero bypasses the cache because 0.0 and -0.0 share a cache key.
+    """
+    if value == 0:
+        return "-0" if math.copysign(1.0, value) < 0 else "0"
+    return _format_nonzero_float(value)
+
+
 def write_face(face: Face) -> str:
     """Write a single face definition"""
     # Format: ( p1 ) ( p2 ) ( p3 ) texture u v rot su sv
-    p1 = face.point1
-    p2 = face.point2
-    p3 = face.point3
+    c = face.coords
     
     return (
-        f"( {format_float(p1.x)} {format_float(p1.y)} {format_float(p1.z)} ) "
-        f"( {format_float(p2.x)} {format_float(p2.y)} {format_float(p2.z)} ) "
-        f"( {format_float(p3.x)} {format_float(p3.y)} {format_float(p3.z)} ) "
+        f"( {format_float(c[0])} {format_float(c[1])} {format_float(c[2])} ) "
+        f"( {format_float(c[3])} {format_float(c[4])} {format_float(c[5])} ) "
+        f"( {format_float(c[6])} {format_float(c[7])} {format_float(c[8])} ) "
         f"{face.texture} "
         f"{format_float(face.offset_u)} "
         f"{format_float(face.offset_v)} "
@@ -34,55 +46,78 @@ def write_face(face: Face) -> str:
     )
 
 
-def write_brush(brush: Brush, indent: str = "") -> str:
-    """Write a brush definition with its faces"""
-    lines = [f"{indent}{{"]
+def _append_brush(out: List[str], brush: Brush, indent: str = "") -> None:
+    """Append the lines of a brush definition to out"""
+    out.append(f"{indent}{{")
     
+    face_indent = f"{indent}    "
     for face in brush.faces:
-        lines.append(f"{indent}    {write_face(face)}")
-    
-    lines.append(f"{indent}}}")
+        out.append(face_indent + write_face(face))
     
-    return "\n".join(lines)
+    out.append(f"{indent}}}")
 
 
-def write_entity(entity: Entity, index: int) -> str:
-    """Write an entity with its properties and brushes"""
-    lines = ["{"]
+def _append_entity(out: List[str], entity: Entity) -> None:
+    """Append the lines of an entity with its properties and brushes to out"""
+    out.append("{")
     
     # Write properties
     for key, value in entity.properties.items():
         # Escape quotes in value
         escaped_value = value.replace('"', '\\"')
-        lines.append(f'    "{key}" "{escaped_value}"')
+        out.append(f'    "{key}" "{escaped_value}"')
     
     # Write brushes
     for brush in entity.brushes:
-        lines.append(write_brush(brush, indent="    "))
-    
-    lines.append("}")
+        _append_brush(out, brush, indent="    ")
     
+    out.append("}")
+
+
+def write_brush(brush: Brush, indent: str = "") -> str:
+    """Write a brush definition with its faces"""
+    lines: List[str] = []
+    _append_brush(lines, brush, indent)
+    return "\n".join(lines)
+
+
+def write_entity(entity: Entity, index: int) -> str:
+    """Write an entity with its properties and brushes"""
+    lines: List[str] = []
+    _append_entity(lines, entity)
     return "\n".join(lines)
 
 
 def write_map_to_string(mapfile: MapFile) -> str:
-    """Write complete map to string"""
-    lines = []
+    """Write complete map to string
+    
+    Every line of the map goes into one flat list that is joined once.
+    """
+    lines: List[str] = []
     
     for i, entity in enumerate(mapfile.entities):
         if i > 0:
             lines.append("")  # Empty line between entities
-        lines.append(write_entity(entity, i))
+        _append_entity(lines, entity)
     
     return "\n".join(lines)
 
 
 def write_map(mapfile: MapFile, filepath: str) -> None:
-    """Write map to file"""
-    content = write_map_to_string(mapfile)
+    """Write map to file
+    
+    Entities are formatted and written one at a time rather than building
+    the whole map as a single string first.
+    """
+    lines: List[str] = []
     
     with open(filepath, 'w') as f:
-        f.write(content)
+        for i, entity in enumerate(mapfile.entities):
+            if i > 0:
+                f.write("\n\n")  # End previous entity, empty line between
+            _append_entity(lines, entity)
+            f.write("\n".join(lines))
+            lines.clear()
         f.write("\n")  # Trailing newline
 
 
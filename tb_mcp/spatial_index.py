@@ -0,0 +1,89 @@
+"""
+Spatial index for map geometry
+Uniform grid over points so radius queries only visit nearby cells
+"""
+import math
+from typing import Dict, Hashable, Iterator, List, Tuple
+from .map_types import Vec3
+
+Cell = Tuple[int, int, int]
+Point = Tuple[float, float, float]
+
+
+class PointGrid:
+    """Points bucketed into cubic cells, keyed by caller-chosen ids
+
+    Points are stored as plain (x, y, z) float tuples so queries can do the
+    distance arithmetic inline; Vec3s are only built for hits.
+    """
+
+    def __init__(self, cell_size: float = 256.0):
+        self.cell_size = cell_size
+        self._cells: Dict[Cell, Dict[Hashable, Point]] = {}
+        self._cell_of: Dict[Hashable, Cell] = {}
+
+    def __len__(self) -> int:
+        return len(self._cell_of)
+
+    def _cell(self, x: float, y: float, z: float) -> Cell:
+        size = self.cell_size
+        return (math.floor(x / size), math.floor(y / size), math.floor(z / size))
+
+    def clear(self) -> None:
+        self._cells.clear()
+        self._cell_of.clear()
+
+    def insert(self, key: Hashable, point: Vec3) -> None:
+        """Insert or move the point stored under key"""
+        self.remove(key)
+        cell = self._cell(point.x, point.y, point.z)
+        self._cells.setdefault(cell, {})[key] = (point.x, point.y, point.z)
+        self._cell_of[key] = cell
+
+    def remove(self, key: Hashable) -> None:
+        """Remove key if present"""
+        cell = self._cell_of.pop(key, None)
+        if cell is None:
+            return
+        bucket = self._cells[cell]
+        del bucket[key]
+        if not bucket:
+            del self._cells[cell]
+
+    def _candidate_buckets(self, point: Vec3, radius: float) -> Iterator[Dict[Hashable, Point]]:
+        lo = self._cell(point.x - radius, point.y - radius, point.z - radius)
+        hi = self._cell(point.x + radius, point.y + radius, point.z + radius)
+        span = (hi[0] - lo[0] + 1) * (hi[1] - lo[1] + 1) * (hi[2] - lo[2] + 1)
+
+        # Huge radius: cheaper to walk the occupied cells than the empty ones
+        if span >= len(self._cells):
+            for cell, bucket in self._cells.items():
+                if lo[0] <= cell[0] <= hi[0] and lo[1] <= cell[1] <= hi[1] and lo[2] <= cell[2] <= hi[2]:
+                    yield bucket
+            return
+
+        for cx in range(lo[0], hi[0] + 1):
+            for cy in range(lo[1], hi[1] + 1):
+                for cz in range(lo[2], hi[2] + 1):
+                    bucket = self._cells.get((cx, cy, cz))
+                    if bucket:
+                        yield bucket
+
+    def query_radius(self, point: Vec3, radius: float) -> List[Tuple[Hashable, Vec3, float]]:
+        """Return (key, point, distance) for every point within radius"""
+        if radius < 0 or not self._cells:
+            return []
+
+        px, py, pz = point.x, point.y, point.z
+        sqrt = math.sqrt
+        hits = []
+        for bucket in self._candidate_buckets(point, radius):
+            for key, (x, y, z) in bucket.items():
+                # Same arithmetic as Vec3.distance, without the temporaries
+                dx = px - x
+                dy = py - y
+                dz = pz - z
+                dist = sqrt(dx * dx + dy * dy + dz * dz)
+                if dist <= radius:
+                    hits.append((key, Vec3(x, y, z), dist))
+        return hits
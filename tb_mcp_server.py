@@ -6,138 +6,334 @@ Provides programmatic control of Quake .map files via MCP protocol
 
 import asyncio
 import json
-import subprocess
+import os
+import pickle
 import sys
+from collections import deque
 from pathlib import Path
-from typing import Optional, List, Dict, Any
-from datetime import datetime
+from typing import Annotated, Optional, List, Dict, Any, Set, Tuple
 
 # Add parent directory to path for tb_mcp imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+import anyio
 from fastapi import FastAPI, Request
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import Response, StreamingResponse, JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.gzip import GZipMiddleware
 import uvicorn
-from sse_starlette.sse import EventSourceResponse
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
 from tb_mcp.map_types import MapFile, Entity, Brush, Vec3
-from tb_mcp.map_parser import parse_map, parse_map_file, ParseError
+from tb_mcp.map_parser import parse_map, ParseError
 from tb_mcp.map_writer import write_map, write_map_to_string
+from tb_mcp.spatial_index import PointGrid
+from tb_mcp.jsonh import hc_encode, hc_encode_dicts
 
 # Configuration
 PROJECT_DIR = Path("/Users/jtally/br1k3")
 MAPS_DIR = PROJECT_DIR / "assets/maps"
 BUILD_DIR = PROJECT_DIR / "build"
 PACK_MAP = PROJECT_DIR / "pack_map"
-
-# Global state
+MAP_CACHE_DIR = BUILD_DIR / ".mapcache"
+# Bump when the pickled tb_mcp.map_types layouts change
+MAP_CACHE_VERSION = 1
+COMPILE_OUTPUT_LINES = 500  # pack_map output kept per stream (the tail)
+
+# Global state. Only ever changed on the event loop: load_map builds a new map
+# and its indexes in the threadpool and swaps them all in at once
+# (install_map), so handlers never see a half-loaded map.
 loaded_map: Optional[MapFile] = None
 current_map_file: Optional[str] = None
 
+# Spatial indexes for get_geometry_at_point: entity origins keyed by entity
+# index, brush centers keyed by (entity index, brush index). Hits carry their
+# indices, so no entities.index() scans are needed. Keys are list positions:
+# anything that removes entities or brushes must rebuild them
+# (build_spatial_index).
+entity_grid = PointGrid()
+brush_grid = PointGrid()
+
+# Face textures of the loaded map, collected on load and extended as brushes
+# are added; map_texture_list is the sorted form get_map_info reports.
+map_textures: Set[str] = set()
+map_texture_list: List[str] = []
+
+# Field order for compact (JSONH-style, see tb_mcp.jsonh) entity/brush lists
+LOAD_MAP_ENTITY_KEYS = ("index", "classname", "origin", "brush_count", "properties")
+MAP_INFO_ENTITY_KEYS = (
+    "index",
+    "classname",
+    "origin",
+    "brush_count",
+    "brushes",
+    "properties",
+)
+MAP_INFO_BRUSH_KEYS = ("index", "face_count", "center", "bounds")
+
 app = FastAPI(title="TrenchBroom MCP Server", version="1.0.0")
+# Map descriptions are mostly repeated keys and ASCII floats and compress
+# ~6x; clients opt in with Accept-Encoding. SSE streams are never gzipped.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+
+
+def map_cache_path(map_path: Path) -> Path:
+    return MAP_CACHE_DIR / f"{map_path.name}.pickle"
+
+
+def map_cache_key(stat: os.stat_result) -> tuple:
+    return (MAP_CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+
+
+def store_map_cache(map_path: Path, mapfile: MapFile, stat: os.stat_result) -> None:
+    """Pickle a parsed map under the key of the stat its contents match
+
+    stat must be taken on the same open file the map was parsed from, so a
+    concurrent rewrite can't pair new metadata with old contents.
+    """
+    try:
+        MAP_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(map_cache_path(map_path), "wb") as f:
+            pickle.dump(map_cache_key(stat), f, pickle.HIGHEST_PROTOCOL)
+            pickle.dump(mapfile, f, pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass  # Caching is best effort
+
+
+def load_map_cached(map_path: Path) -> MapFile:
+    """Parse a .map file, reusing the pickled parse if the file is unchanged"""
+    with open(map_path, "rb") as f:
+        # Stat before reading: if the file changes in between, the key is
+        # already stale and the next load parses again
+        stat = os.fstat(f.fileno())
+        try:
+            with open(map_cache_path(map_path), "rb") as cache:
+                if pickle.load(cache) == map_cache_key(stat):
+                    return pickle.load(cache)
+        except Exception:
+            pass  # Missing, stale-format or corrupt cache: parse instead
+
+        mapfile = parse_map(f.read())
+
+    store_map_cache(map_path, mapfile, stat)
+    return mapfile
+
+
+def index_entity_into(
+    entities: PointGrid,
+    brushes: PointGrid,
+    entity_index: int,
+    entity: Entity,
+    brush_index: Optional[int] = None,
+) -> None:
+    """(Re)insert an entity's origin and brush centers into spatial indexes
+
+    With brush_index only that brush is refreshed, plus the entity origin
+    (which may be derived from brush centers).
+    """
+    origin = entity.origin
+    if origin:
+        entities.insert(entity_index, origin)
+    else:
+        entities.remove(entity_index)
+
+    if brush_index is not None:
+        brushes.insert((entity_index, brush_index), entity.brushes[brush_index].center())
+        return
+
+    for i, brush in enumerate(entity.brushes):
+        brushes.insert((entity_index, i), brush.center())
+
+
+def index_entity(entity_index: int, brush_index: Optional[int] = None) -> None:
+    """Refresh a loaded map entity in the live spatial indexes"""
+    index_entity_into(
+        entity_grid, brush_grid, entity_index, loaded_map.entities[entity_index], brush_index
+    )
+
+
+def build_spatial_index(mapfile: MapFile) -> Tuple[PointGrid, PointGrid]:
+    """Build fresh (entity, brush) spatial indexes for a map"""
+    entities = PointGrid()
+    brushes = PointGrid()
+    for i, entity in enumerate(mapfile.entities):
+        index_entity_into(entities, brushes, i, entity)
+    return entities, brushes
+
+
+def entity_textures(entity: Entity) -> Set[str]:
+    return {face.texture for brush in entity.brushes for face in brush.faces}
+
+
+def index_textures(entity: Entity) -> None:
+    """Add an entity's face textures to the live texture index"""
+    global map_texture_list
+    new = entity_textures(entity) - map_textures
+    if new:
+        map_textures.update(new)
+        map_texture_list = sorted(map_textures)
+
+
+def build_texture_index(mapfile: MapFile) -> Set[str]:
+    """Collect the face textures of a map"""
+    textures = set()
+    for entity in mapfile.entities:
+        textures |= entity_textures(entity)
+    return textures
+
+
+def install_map(
+    map_file: str,
+    mapfile: MapFile,
+    grids: Tuple[PointGrid, PointGrid],
+    textures: Set[str],
+) -> None:
+    """Make a parsed and indexed map current
+
+    Must run on the event loop; there is no await in here, so the swap is
+    atomic with respect to the other handlers.
+    """
+    global loaded_map, current_map_file, entity_grid, brush_grid
+    global map_textures, map_texture_list
+    loaded_map = mapfile
+    current_map_file = map_file
+    entity_grid, brush_grid = grids
+    map_textures = textures
+    map_texture_list = sorted(textures)
+
+
+async def read_tail(stream: asyncio.StreamReader) -> str:
+    """Drain a subprocess pipe, keeping only its last COMPILE_OUTPUT_LINES lines"""
+    tail = deque(maxlen=COMPILE_OUTPUT_LINES)
+    async for line in stream:
+        tail.append(line)
+    return b"".join(tail).decode(errors="replace")
 
 
 class MapEditor:
     """Map editing operations"""
 
     @staticmethod
-    def load_map(map_file: str) -> Dict[str, Any]:
-        """Load a .map file from the maps directory"""
-        global loaded_map, current_map_file
+    async def load_map(map_file: str, compact: bool = False) -> Dict[str, Any]:
+        """Load a .map file from the maps directory
 
+        With compact, the entity list is JSONH-encoded (tb_mcp.jsonh.hc_decode).
+        Parsing, indexing and describing run in the threadpool on objects no
+        other handler can see yet; the result is then installed in one step.
+        """
         map_path = MAPS_DIR / map_file
         if not map_path.exists():
             return {"success": False, "error": f"Map file not found: {map_file}"}
 
-        try:
-            loaded_map = parse_map_file(str(map_path))
-            current_map_file = map_file
-
-            # Gather info
-            entities = []
-            for i, entity in enumerate(loaded_map.entities):
-                origin = entity.origin
-                entities.append(
-                    {
-                        "index": i,
-                        "classname": entity.classname,
-                        "origin": origin.to_list() if origin else None,
-                        "brush_count": len(entity.brushes),
-                        "properties": {
-                            k: v
-                            for k, v in entity.properties.items()
-                            if k != "classname"
-                        },
-                    }
-                )
-
-            return {
-                "success": True,
-                "map_file": map_file,
-                "entity_count": len(loaded_map.entities),
-                "brush_count": loaded_map.brush_count(),
-                "entities": entities,
-            }
+        def prepare():
+            mapfile = load_map_cached(map_path)
+            return (
+                mapfile,
+                build_spatial_index(mapfile),
+                build_texture_index(mapfile),
+                MapEditor.describe_loaded_map(map_file, mapfile, compact),
+            )
 
+        try:
+            mapfile, grids, textures, result = await run_in_threadpool(prepare)
         except ParseError as e:
             return {"success": False, "error": f"Parse error: {str(e)}"}
         except Exception as e:
             return {"success": False, "error": f"Error loading map: {str(e)}"}
 
-    @staticmethod
-    def get_map_info() -> Dict[str, Any]:
-        """Get detailed information about the currently loaded map"""
-        if loaded_map is None:
-            return {"success": False, "error": "No map loaded"}
-
-        # Collect entity info
-        entities = []
-        textures = set()
+        install_map(map_file, mapfile, grids, textures)
+        return result
 
-        for i, entity in enumerate(loaded_map.entities):
+    @staticmethod
+    def describe_loaded_map(
+        map_file: str, mapfile: MapFile, compact: bool = False
+    ) -> Dict[str, Any]:
+        """Build load_map's result for a freshly parsed map"""
+        # Gather info, one row per entity in LOAD_MAP_ENTITY_KEYS order
+        rows = []
+        for i, entity in enumerate(mapfile.entities):
             origin = entity.origin
-            brushes_info = []
-
-            for j, brush in enumerate(entity.brushes):
-                brush_bounds = brush.bounds()
-                brushes_info.append(
-                    {
-                        "index": j,
-                        "face_count": len(brush.faces),
-                        "center": brush.center().to_list(),
-                        "bounds": {
-                            "min": brush_bounds[0].to_list(),
-                            "max": brush_bounds[1].to_list(),
-                        }
-                        if brush_bounds
-                        else None,
-                    }
+            rows.append(
+                (
+                    i,
+                    entity.classname,
+                    origin.to_list() if origin else None,
+                    len(entity.brushes),
+                    {k: v for k, v in entity.properties.items() if k != "classname"},
                 )
+            )
 
-                # Collect textures
-                for face in brush.faces:
-                    textures.add(face.texture)
+        if compact:
+            entities = hc_encode(rows, LOAD_MAP_ENTITY_KEYS)
+        else:
+            entities = [dict(zip(LOAD_MAP_ENTITY_KEYS, row)) for row in rows]
 
-            entities.append(
+        return {
+            "success": True,
+            "map_file": map_file,
+            "entity_count": len(mapfile.entities),
+            "brush_count": mapfile.brush_count(),
+            "entities": entities,
+        }
+
+    @staticmethod
+    def entity_info(
+        index: int, entity: Entity, compact: bool = False
+    ) -> Dict[str, Any]:
+        """Describe one entity and its brushes
+
+        With compact, the brush list is JSONH-encoded.
+        """
+        origin = entity.origin
+        brushes_info = []
+
+        for j, brush in enumerate(entity.brushes):
+            # One bounds() call; the center is derived as Brush.center() does
+            min_b, max_b = brush.bounds()
+            brushes_info.append(
                 {
-                    "index": i,
-                    "classname": entity.classname,
-                    "origin": origin.to_list() if origin else None,
-                    "brush_count": len(entity.brushes),
-                    "brushes": brushes_info,
-                    "properties": {
-                        k: v for k, v in entity.properties.items() if k != "classname"
-                    },
+                    "index": j,
+                    "face_count": len(brush.faces),
+                    "center": ((min_b + max_b) / 2.0).to_list(),
+                    "bounds": {"min": min_b.to_list(), "max": max_b.to_list()},
                 }
             )
 
         return {
-            "success": True,
-            "map_file": current_map_file,
-            "entity_count": len(loaded_map.entities),
-            "brush_count": loaded_map.brush_count(),
+            "index": index,
+            "classname": entity.classname,
+            "origin": origin.to_list() if origin else None,
+            "brush_count": len(entity.brushes),
+            "brushes": hc_encode_dicts(brushes_info, MAP_INFO_BRUSH_KEYS)
+            if compact
+            else brushes_info,
+            "properties": {
+                k: v for k, v in entity.properties.items() if k != "classname"
+            },
+        }
+
+    @staticmethod
+    def get_map_info(compact: bool = False) -> Dict[str, Any]:
+        """Get detailed information about the currently loaded map
+
+        With compact, entity and brush lists are JSONH-encoded.
+        """
+        if loaded_map is None:
+            return {"success": False, "error": "No map loaded"}
+
+        # Collect entity info
+        entities = [
+            MapEditor.entity_info(i, entity, compact)
+            for i, entity in enumerate(loaded_map.entities)
+        ]
+        if compact:
+            entities = hc_encode_dicts(entities, MAP_INFO_ENTITY_KEYS)
+
+        return {
+            **map_info_head(loaded_map, len(loaded_map.entities)),
             "entities": entities,
-            "textures": sorted(list(textures)),
+            "textures": list(map_texture_list),
         }
 
     @staticmethod
@@ -148,30 +344,28 @@ class MapEditor:
         if loaded_map is None:
             return {"success": False, "error": "No map loaded"}
 
-        try:
-            entity = Entity(classname=classname)
-
-            # Set origin
-            if len(origin) >= 3:
-                entity.origin = Vec3(origin[0], origin[1], origin[2])
+        entity = Entity(classname=classname)
 
-            # Add custom properties
-            if properties:
-                for key, value in properties.items():
-                    if key != "classname":  # Already set
-                        entity.set_property(key, value)
+        # Set origin
+        if len(origin) >= 3:
+            entity.origin = Vec3(origin[0], origin[1], origin[2])
 
-            index = loaded_map.add_entity(entity)
+        # Add custom properties
+        if properties:
+            for key, value in properties.items():
+                if key != "classname":  # Already set
+                    entity.set_property(key, value)
 
-            return {
-                "success": True,
-                "entity_index": index,
-                "classname": classname,
-                "origin": entity.origin.to_list() if entity.origin else None,
-            }
+        index = loaded_map.add_entity(entity)
+        index_entity(index)
+        index_textures(entity)
 
-        except Exception as e:
-            return {"success": False, "error": f"Error adding entity: {str(e)}"}
+        return {
+            "success": True,
+            "entity_index": index,
+            "classname": classname,
+            "origin": entity.origin.to_list() if entity.origin else None,
+        }
 
     @staticmethod
     def move_entity(entity_id: int, origin: List[float]) -> Dict[str, Any]:
@@ -183,23 +377,20 @@ class MapEditor:
         if entity is None:
             return {"success": False, "error": f"Entity {entity_id} not found"}
 
-        try:
-            old_origin = entity.origin
-
-            if len(origin) >= 3:
-                new_origin = Vec3(origin[0], origin[1], origin[2])
-                entity.move_to(new_origin)
+        old_origin = entity.origin
 
-            return {
-                "success": True,
-                "entity_id": entity_id,
-                "classname": entity.classname,
-                "old_origin": old_origin.to_list() if old_origin else None,
-                "new_origin": entity.origin.to_list() if entity.origin else None,
-            }
+        if len(origin) >= 3:
+            new_origin = Vec3(origin[0], origin[1], origin[2])
+            entity.move_to(new_origin)
+            index_entity(entity_id)
 
-        except Exception as e:
-            return {"success": False, "error": f"Error moving entity: {str(e)}"}
+        return {
+            "success": True,
+            "entity_id": entity_id,
+            "classname": entity.classname,
+            "old_origin": old_origin.to_list() if old_origin else None,
+            "new_origin": entity.origin.to_list() if entity.origin else None,
+        }
 
     @staticmethod
     def move_brush(
@@ -219,28 +410,31 @@ class MapEditor:
                 "error": f"Brush {brush_index} not found in entity {entity_id}",
             }
 
-        try:
-            brush = entity.brushes[brush_index]
-            old_center = brush.center()
-
-            if len(offset) >= 3:
-                offset_vec = Vec3(offset[0], offset[1], offset[2])
-                brush.move(offset_vec)
+        brush = entity.brushes[brush_index]
+        old_center = brush.center()
 
-            return {
-                "success": True,
-                "entity_id": entity_id,
-                "brush_index": brush_index,
-                "old_center": old_center.to_list(),
-                "new_center": brush.center().to_list(),
-            }
+        if len(offset) >= 3:
+            offset_vec = Vec3(offset[0], offset[1], offset[2])
+            brush.move(offset_vec)
+            index_entity(entity_id, brush_index)
 
-        except Exception as e:
-            return {"success": False, "error": f"Error moving brush: {str(e)}"}
+        return {
+            "success": True,
+            "entity_id": entity_id,
+            "brush_index": brush_index,
+            "old_center": old_center.to_list(),
+            "new_center": brush.center().to_list(),
+        }
 
     @staticmethod
-    def save_map(map_file: str = None) -> Dict[str, Any]:
-        """Save the current map to file"""
+    async def save_map(map_file: str = None) -> Dict[str, Any]:
+        """Save the current map to file
+
+        The map is copied on the event loop and the copy is written in the
+        threadpool, so edits made meanwhile can't tear it. The parse cache
+        is left alone: what gets written is rounded and escaped, so it is
+        not the in-memory map, and the next load parses the file itself.
+        """
         if loaded_map is None:
             return {"success": False, "error": "No map loaded"}
 
@@ -248,24 +442,30 @@ class MapEditor:
         if not target_file:
             return {"success": False, "error": "No map file specified"}
 
-        try:
-            map_path = MAPS_DIR / target_file
-            write_map(loaded_map, str(map_path))
-
-            return {
-                "success": True,
-                "map_file": target_file,
-                "entity_count": len(loaded_map.entities),
-                "brush_count": loaded_map.brush_count(),
-                "message": f"Map saved to {map_path}",
-            }
+        snapshot = loaded_map.copy()
+        map_path = MAPS_DIR / target_file
 
+        try:
+            await run_in_threadpool(write_map, snapshot, str(map_path))
         except Exception as e:
             return {"success": False, "error": f"Error saving map: {str(e)}"}
 
+        return {
+            "success": True,
+            "map_file": target_file,
+            "entity_count": len(snapshot.entities),
+            "brush_count": snapshot.brush_count(),
+            "message": f"Map saved to {map_path}",
+        }
+
     @staticmethod
-    def compile_map() -> Dict[str, Any]:
-        """Compile the current map using pack_map"""
+    async def compile_map() -> Dict[str, Any]:
+        """Compile the current map using pack_map
+
+        Runs pack_map as an asyncio subprocess so the event loop keeps serving
+        other requests while it compiles. Output is read as it is produced;
+        only the last COMPILE_OUTPUT_LINES lines of each stream are returned.
+        """
         global current_map_file
 
         if loaded_map is None:
@@ -275,7 +475,7 @@ class MapEditor:
             return {"success": False, "error": "No map file specified"}
 
         # Ensure map is saved first
-        save_result = MapEditor.save_map()
+        save_result = await MapEditor.save_map()
         if not save_result["success"]:
             return save_result
 
@@ -288,27 +488,33 @@ class MapEditor:
             plb_name = current_map_file.replace(".map", ".plb")
             plb_path = BUILD_DIR / plb_name
 
-            result = subprocess.run(
-                [str(PACK_MAP), str(map_path), str(plb_path)],
-                capture_output=True,
-                text=True,
+            proc = await asyncio.create_subprocess_exec(
+                str(PACK_MAP),
+                str(map_path),
+                str(plb_path),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 cwd=str(PROJECT_DIR),
             )
+            stdout, stderr = await asyncio.gather(
+                read_tail(proc.stdout), read_tail(proc.stderr)
+            )
+            await proc.wait()
 
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 return {
                     "success": True,
                     "map_file": current_map_file,
                     "plb_file": str(plb_path),
                     "message": f"Compiled successfully: {plb_path}",
-                    "stdout": result.stdout if result.stdout else None,
+                    "stdout": stdout if stdout else None,
                 }
             else:
                 return {
                     "success": False,
                     "error": f"Compilation failed",
-                    "stderr": result.stderr,
-                    "stdout": result.stdout,
+                    "stderr": stderr,
+                    "stdout": stdout,
                 }
 
         except Exception as e:
@@ -328,71 +534,63 @@ class MapEditor:
                 "error": "Position must have 3 coordinates [x, y, z]",
             }
 
-        try:
-            point = Vec3(position[0], position[1], position[2])
-
-            nearby_entities = []
-            nearby_brushes = []
-
-            for entity in loaded_map.entities:
-                origin = entity.origin
-                if origin:
-                    dist = point.distance(origin)
-                    if dist <= radius:
-                        nearby_entities.append(
-                            {
-                                "index": loaded_map.entities.index(entity),
-                                "classname": entity.classname,
-                                "distance": dist,
-                                "origin": origin.to_list(),
-                            }
-                        )
-
-                # Check brush centers
-                for i, brush in enumerate(entity.brushes):
-                    center = brush.center()
-                    dist = point.distance(center)
-                    if dist <= radius:
-                        bounds = brush.bounds()
-                        nearby_brushes.append(
-                            {
-                                "entity_index": loaded_map.entities.index(entity),
-                                "brush_index": i,
-                                "entity_classname": entity.classname,
-                                "distance": dist,
-                                "center": center.to_list(),
-                                "bounds": {
-                                    "min": bounds[0].to_list(),
-                                    "max": bounds[1].to_list(),
-                                }
-                                if bounds
-                                else None,
-                            }
-                        )
-
-            # Sort by distance
-            nearby_entities.sort(key=lambda x: x["distance"])
-            nearby_brushes.sort(key=lambda x: x["distance"])
+        point = Vec3(position[0], position[1], position[2])
 
-            return {
-                "success": True,
-                "position": position,
-                "radius": radius,
-                "entity_count": len(nearby_entities),
-                "brush_count": len(nearby_brushes),
-                "entities": nearby_entities,
-                "brushes": nearby_brushes,
-            }
+        nearby_entities = []
+        nearby_brushes = []
 
-        except Exception as e:
-            return {"success": False, "error": f"Error getting geometry: {str(e)}"}
+        for entity_index, origin, dist in entity_grid.query_radius(point, radius):
+            entity = loaded_map.entities[entity_index]
+            nearby_entities.append(
+                {
+                    "index": entity_index,
+                    "classname": entity.classname,
+                    "distance": dist,
+                    "origin": origin.to_list(),
+                }
+            )
+
+        for (entity_index, i), center, dist in brush_grid.query_radius(point, radius):
+            entity = loaded_map.entities[entity_index]
+            bounds = entity.brushes[i].bounds()
+            nearby_brushes.append(
+                {
+                    "entity_index": entity_index,
+                    "brush_index": i,
+                    "entity_classname": entity.classname,
+                    "distance": dist,
+                    "center": center.to_list(),
+                    "bounds": {
+                        "min": bounds[0].to_list(),
+                        "max": bounds[1].to_list(),
+                    }
+                    if bounds
+                    else None,
+                }
+            )
+
+        # Sort by distance, ties in map order
+        nearby_entities.sort(key=lambda x: (x["distance"], x["index"]))
+        nearby_brushes.sort(
+            key=lambda x: (x["distance"], x["entity_index"], x["brush_index"])
+        )
+
+        return {
+            "success": True,
+            "position": position,
+            "radius": radius,
+            "entity_count": len(nearby_entities),
+            "brush_count": len(nearby_brushes),
+            "entities": nearby_entities,
+            "brushes": nearby_brushes,
+        }
 
 
 class TrenchBroomLauncher:
     """Launch and control TrenchBroom map editor"""
 
     @staticmethod
-    def launch(map_file: Optional[str] = None) -> Dict[str, Any]:
+    async def launch(map_file: Optional[str] = None) -> Dict[str, Any]:
         """Launch TrenchBroom with optional map file"""
         try:
             # TrenchBroom executable path
@@ -411,11 +609,11 @@ class TrenchBroomLauncher:
                     }
                 cmd.append(map_path)
 
-            # Launch TrenchBroom
-            subprocess.Popen(
-                cmd,
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
+            # Launch TrenchBroom (fire and forget, detached session)
+            await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
                 start_new_session=True,
             )
 
@@ -443,13 +641,24 @@ MCP_TOOLS = {
                 "type": "string",
                 "description": "Name of the map file (e.g., 'm1.map')",
                 "required": True,
-            }
+            },
+            "compact": {
+                "type": "boolean",
+                "description": "Encode the entity list as [key_count, *keys, *values] (default false)",
+                "required": False,
+            },
         },
     },
     "get_map_info": {
         "name": "get_map_info",
         "description": "Get detailed information about the currently loaded map including all entities, brushes, and textures",
-        "parameters": {},
+        "parameters": {
+            "compact": {
+                "type": "boolean",
+                "description": "Encode entity and brush lists as [key_count, *keys, *values] (default false)",
+                "required": False,
+            }
+        },
     },
     "add_entity": {
         "name": "add_entity",
@@ -556,81 +765,294 @@ MCP_TOOLS = {
 
 
 # Tool dispatch
+# Tool parameter models, mirroring the inputSchemas in MCP_TOOLS. Unknown
+# keys are ignored; short coordinate lists are accepted as before (the
+# handlers only act on three or more values).
+
+# Positions and offsets must be finite and bounded: inf/nan (JSON 1e400) or
+# values near the float limit would overflow brush centers and the spatial
+# grid after the geometry had already been changed.
+COORD_LIMIT = float(1 << 30)
+Coordinate = Annotated[
+    float, Field(allow_inf_nan=False, ge=-COORD_LIMIT, le=COORD_LIMIT)
+]
+
+
+class LoadMapParams(BaseModel):
+    map_file: str
+    compact: bool = False
+
+
+class GetMapInfoParams(BaseModel):
+    compact: bool = False
+
+
+class AddEntityParams(BaseModel):
+    # Property values are written as text; accept numbers like 90 for "90"
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    classname: str
+    origin: List[Coordinate] = []
+    properties: Optional[Dict[str, str]] = None
+
+
+class MoveEntityParams(BaseModel):
+    entity_id: int
+    origin: List[Coordinate] = []
+
+
+class MoveBrushParams(BaseModel):
+    entity_id: int
+    brush_index: int
+    offset: List[Coordinate] = []
+
+
+class SaveMapParams(BaseModel):
+    map_file: Optional[str] = None
+
+
+class CompileMapParams(BaseModel):
+    pass
+
+
+class GetGeometryParams(BaseModel):
+    position: List[Coordinate] = []
+    radius: Annotated[float, Field(allow_inf_nan=False)] = 32.0
+
+
+class LaunchParams(BaseModel):
+    map_file: Optional[str] = None
+
+
+# Tool name -> (parameter model, handler taking the validated parameters).
+# Quick in-memory edits return their result dict directly and run on the loop.
+# Blocking tools return a coroutine: load_map and save_map do their parsing
+# and writing in the threadpool, compile_map and launch_trenchbroom run
+# subprocesses. get_map_info on a loaded map never gets here: /invoke streams
+# it, iterating stream_map_info in the threadpool.
+TOOL_HANDLERS = {
+    "load_map": (
+        LoadMapParams,
+        lambda p: MapEditor.load_map(p.map_file, p.compact),
+    ),
+    "get_map_info": (
+        GetMapInfoParams,
+        lambda p: MapEditor.get_map_info(p.compact),
+    ),
+    "add_entity": (
+        AddEntityParams,
+        lambda p: MapEditor.add_entity(p.classname, p.origin, p.properties),
+    ),
+    "move_entity": (
+        MoveEntityParams,
+        lambda p: MapEditor.move_entity(p.entity_id, p.origin),
+    ),
+    "move_brush": (
+        MoveBrushParams,
+        lambda p: MapEditor.move_brush(p.entity_id, p.brush_index, p.offset),
+    ),
+    "save_map": (
+        SaveMapParams,
+        lambda p: MapEditor.save_map(p.map_file),
+    ),
+    "compile_map": (
+        CompileMapParams,
+        lambda p: MapEditor.compile_map(),
+    ),
+    "get_geometry_at_point": (
+        GetGeometryParams,
+        lambda p: MapEditor.get_geometry_at_point(p.position, p.radius),
+    ),
+    "launch_trenchbroom": (
+        LaunchParams,
+        lambda p: TrenchBroomLauncher.launch(p.map_file),
+    ),
+}
+
+
+
+def validation_message(error: ValidationError) -> str:
+    """One-line summary of a ValidationError, e.g. "origin.0: Input should be ..." """
+    return "; ".join(
+        f"{'.'.join(map(str, err['loc'])) or 'parameters'}: {err['msg']}"
+        for err in error.errors()
+    )
+
+
+def validate_params(tool_name: str, model: type, parameters: Any):
+    """Validate a tool's parameters: (params, None), or (None, error result)"""
+    try:
+        return model.model_validate(parameters), None
+    except ValidationError as e:
+        return None, {
+            "success": False,
+            "error": f"Invalid parameters for {tool_name}: {validation_message(e)}",
+        }
+
+
 async def dispatch_tool(tool_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
     """Dispatch tool call to appropriate handler"""
+    entry = TOOL_HANDLERS.get(tool_name)
+    if entry is None:
+        return {"success": False, "error": f"Unknown tool: {tool_name}"}
 
-    if tool_name == "load_map":
-        return MapEditor.load_map(parameters.get("map_file"))
+    model, handler = entry
+    params, error = validate_params(tool_name, model, parameters)
+    if error is not None:
+        return error
 
-    elif tool_name == "get_map_info":
-        return MapEditor.get_map_info()
+    result = handler(params)
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
 
-    elif tool_name == "add_entity":
-        return MapEditor.add_entity(
-            parameters.get("classname"),
-            parameters.get("origin", []),
-            parameters.get("properties"),
-        )
 
-    elif tool_name == "move_entity":
-        return MapEditor.move_entity(
-            parameters.get("entity_id"), parameters.get("origin", [])
-        )
+# json.dumps builds a fresh encoder whenever options are passed; keep one
+JSON_ENCODER = json.JSONEncoder(
+    ensure_ascii=False, allow_nan=False, separators=(",", ":")
+)
 
-    elif tool_name == "move_brush":
-        return MapEditor.move_brush(
-            parameters.get("entity_id"),
-            parameters.get("brush_index"),
-            parameters.get("offset", []),
-        )
 
-    elif tool_name == "save_map":
-        return MapEditor.save_map(parameters.get("map_file"))
+def json_text(content: Any) -> str:
+    """Serialize exactly as JSONResponse renders (compact, UTF-8, no NaN)"""
+    return JSON_ENCODER.encode(content)
 
-    elif tool_name == "compile_map":
-        return MapEditor.compile_map()
 
-    elif tool_name == "get_geometry_at_point":
-        return MapEditor.get_geometry_at_point(
-            parameters.get("position", []), parameters.get("radius", 32.0)
-        )
+class CompactJSONResponse(JSONResponse):
+    """JSONResponse rendered through the shared encoder"""
+
+    def render(self, content: Any) -> bytes:
+        return json_text(content).encode("utf-8")
+
+
+# MCP_TOOLS never changes at runtime: serialize its listings once
+TOOLS_LIST_EVENT = json_text(
+    {
+        "jsonrpc": "2.0",
+        "method": "tools/list",
+        "params": {"tools": list(MCP_TOOLS.values())},
+    }
+)
+TOOLS_BODY = json_text({"tools": list(MCP_TOOLS.values())}).encode("utf-8")
+
+
+STREAM_YIELD_EVERY = 64  # entities described between event loop yields
+STREAM_CHUNK_SIZE = 1 << 16  # characters gathered before each send
 
-    elif tool_name == "launch_trenchbroom":
-        return TrenchBroomLauncher.launch(parameters.get("map_file"))
 
+def map_info_head(mapfile: MapFile, entity_count: int) -> Dict[str, Any]:
+    """Leading fields shared by the buffered and streamed map descriptions"""
+    return {
+        "success": True,
+        "map_file": current_map_file,
+        "entity_count": entity_count,
+        "brush_count": mapfile.brush_count(),
+    }
+
+
+async def describe_entities(entities: List[Entity], compact: bool = False):
+    """Yield (index, entity_info) for each entity
+
+    Runs on the event loop, like every other reader of the live map, and
+    hands control back every STREAM_YIELD_EVERY entities.
+    """
+    for i, entity in enumerate(entities):
+        yield i, MapEditor.entity_info(i, entity, compact)
+        if i % STREAM_YIELD_EVERY == STREAM_YIELD_EVERY - 1:
+            await asyncio.sleep(0)
+
+
+async def coalesce(parts):
+    """Join small string parts into sends of about STREAM_CHUNK_SIZE"""
+    buffer = []
+    size = 0
+    async for part in parts:
+        buffer.append(part)
+        size += len(part)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer)
+
+
+async def map_info_parts(compact: bool = False):
+    mapfile = loaded_map
+    entities = list(mapfile.entities)
+    textures = map_texture_list
+    head = map_info_head(mapfile, len(entities))
+    prefix = '{"jsonrpc":"2.0","result":' + json_text(head)[:-1] + ',"entities":'
+    if compact:
+        # Key header now, then each entity's values spliced into the flat list
+        yield prefix + json_text(hc_encode([], MAP_INFO_ENTITY_KEYS))[:-1]
     else:
-        return {"success": False, "error": f"Unknown tool: {tool_name}"}
+        yield prefix + "["
+
+    async for i, info in describe_entities(entities, compact):
+        if compact:
+            yield "," + json_text([info[k] for k in MAP_INFO_ENTITY_KEYS])[1:-1]
+        else:
+            yield ("," if i else "") + json_text(info)
+
+    yield '],"textures":' + json_text(textures) + "}}"
+
+
+def stream_map_info(compact: bool = False):
+    """Yield the get_map_info JSON-RPC response a chunk at a time
+
+    Produces the same document as the buffered response, without holding
+    every entity's description (or the full JSON string) in memory at once.
+    """
+    return coalesce(map_info_parts(compact))
+
+
+async def map_info_ndjson_parts(compact: bool = False):
+    mapfile = loaded_map
+    entities = list(mapfile.entities)
+    textures = map_texture_list
+    yield json_text({"kind": "header", **map_info_head(mapfile, len(entities))}) + "\n"
+
+    async for i, info in describe_entities(entities, compact):
+        yield json_text({"kind": "entity", **info}) + "\n"
+
+    yield json_text({"kind": "textures", "textures": textures}) + "\n"
+
+
+def stream_map_info_ndjson(compact: bool = False):
+    """Yield the loaded map as newline-delimited JSON records
+
+    One "header" record, one "entity" record per entity (the same fields as
+    get_map_info's entities) and a closing "textures" record, so clients can
+    act on each line as it arrives.
+    """
+    return coalesce(map_info_ndjson_parts(compact))
 
 
 # MCP SSE endpoint
+SSE_PING_INTERVAL = 30  # seconds between keep-alive comment frames
+SSE_PING = ServerSentEvent(comment="keepalive")
+
+
 async def mcp_event_generator(request: Request):
     """Generate SSE events for MCP protocol"""
 
     # Send tools/list event
-    tools_event = {
-        "jsonrpc": "2.0",
-        "method": "tools/list",
-        "params": {"tools": list(MCP_TOOLS.values())},
-    }
-    yield {"event": "tools/list", "data": json.dumps(tools_event)}
-
-    # Keep connection alive with ping
-    while True:
-        if await request.is_disconnected():
-            break
+    yield {"event": "tools/list", "data": TOOLS_LIST_EVENT}
 
-        yield {
-            "event": "ping",
-            "data": json.dumps({"timestamp": datetime.now().isoformat()}),
-        }
-
-        await asyncio.sleep(30)  # Ping every 30 seconds
+    # Hold the stream open. EventSourceResponse sends the keep-alive pings and
+    # cancels this generator as soon as the client disconnects.
+    await anyio.sleep_forever()
 
 
 @app.get("/sse")
 async def sse_endpoint(request: Request):
     """SSE endpoint for MCP protocol"""
-    return EventSourceResponse(mcp_event_generator(request))
+    return EventSourceResponse(
+        mcp_event_generator(request),
+        ping=SSE_PING_INTERVAL,
+        ping_message_factory=lambda: SSE_PING,
+    )
 
 
 @app.post("/invoke")
@@ -639,14 +1061,26 @@ async def invoke_tool(request: Request):
     try:
         body = await request.json()
         tool_name = body.get("tool")
-        parameters = body.get("parameters", {})
+        # "parameters": null means no parameters, as an omitted key does
+        parameters = body.get("parameters")
+        if parameters is None:
+            parameters = {}
+
+        # The full map description can be large: stream it entity by entity
+        if tool_name == "get_map_info" and loaded_map is not None:
+            params, error = validate_params(tool_name, GetMapInfoParams, parameters)
+            if error is not None:
+                return CompactJSONResponse({"jsonrpc": "2.0", "result": error})
+            return StreamingResponse(
+                stream_map_info(params.compact), media_type="application/json"
+            )
 
         result = await dispatch_tool(tool_name, parameters)
 
-        return JSONResponse({"jsonrpc": "2.0", "result": result})
+        return CompactJSONResponse({"jsonrpc": "2.0", "result": result})
 
     except Exception as e:
-        return JSONResponse(
+        return CompactJSONResponse(
             {
                 "jsonrpc": "2.0",
                 "error": {"code": -32603, "message": f"Internal error: {str(e)}"},
@@ -655,6 +1089,17 @@ async def invoke_tool(request: Request):
         )
 
 
+@app.get("/stream/map_info")
+async def stream_map_info_endpoint(compact: bool = False):
+    """Stream the loaded map's description as NDJSON"""
+    if loaded_map is None:
+        return CompactJSONResponse({"success": False, "error": "No map loaded"})
+
+    return StreamingResponse(
+        stream_map_info_ndjson(compact), media_type="application/x-ndjson"
+    )
+
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -668,7 +1113,7 @@ async def health_check():
 @app.get("/tools")
 async def list_tools():
     """List available MCP tools"""
-    return {"tools": list(MCP_TOOLS.values())}
+    return Response(content=TOOLS_BODY, media_type="application/json")
 
 
 if __name__ == "__main__":